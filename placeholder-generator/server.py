@@ -13,11 +13,19 @@ to improve accessibility:
 - Add lang="en" to <html> when missing
 """
 
+import asyncio
+import multiprocessing
 import os
 import re
-from typing import Any, Dict, List, Optional
-
-from fastapi import FastAPI
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -25,7 +33,13 @@ from pydantic import BaseModel
 # FastAPI setup
 # -----------------------------------------------------------------------------
 
-app = FastAPI(title="A11y Placeholder Generator (heuristic)")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the /generate_batch workers along with the server
+    shutdown_batch_pool()
+
+app = FastAPI(title="A11y Placeholder Generator (heuristic)", lifespan=lifespan)
 
 # CORS – wide open for POC; tighten for production.
 app.add_middleware(
@@ -54,25 +68,225 @@ class GenerateResponse(BaseModel):
     edits: List[EditModel]
     warnings: List[str] = []
 
+class GenerateBatchRequest(BaseModel):
+    codes: List[str]
+    mode: Optional[str] = "heuristic"
+
+class GenerateBatchResponse(BaseModel):
+    results: List[GenerateResponse]
+
+# -----------------------------------------------------------------------------
+# Compiled patterns (built once at import, reused by every request)
+# -----------------------------------------------------------------------------
+
+# Elements scanned over the whole document
+IMG_RE = re.compile(r"<img\b([^>]*)\/?>", re.IGNORECASE)
+BUTTON_RE = re.compile(r"<button\b([^>]*)>([\s\S]*?)</button>", re.IGNORECASE)
+INPUT_RE = re.compile(r"<(input|select|textarea)\b([^>]*)\/?>", re.IGNORECASE)
+LINK_RE = re.compile(r"<a\b([^>]*)>([\s\S]*?)</a>", re.IGNORECASE)
+HEADING_RE = re.compile(r"<(h[1-6])\b([^>]*)>([\s\S]*?)</(h[1-6])>", re.IGNORECASE)
+HTML_RE = re.compile(r"<html\b([^>]*)>", re.IGNORECASE)
+LABEL_FOR_RE = re.compile(
+    r'<label\b[^>]*\bfor\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE
+)
+# An aria-hidden match is <name ...aria-hidden="true"...>, taken in three
+# non-backtracking steps: the shortest tag name ending at a word boundary, the
+# attribute after it, then the rest of the tag.
+ARIA_TAG_START_RE = re.compile(r"<[a-z0-9\-]+?\b", re.IGNORECASE)
+ARIA_HIDDEN_ATTR_RE = re.compile(r'aria-hidden\s*=\s*["\']true["\']', re.IGNORECASE)
+TAG_REST_RE = re.compile(r"[^>]*>")
+FOCUSABLE_RE = re.compile(
+    r'(tabindex\s*=\s*["\']0["\']|href=|<button\b|<a\b|<input\b|<select\b|<textarea\b)',
+    re.IGNORECASE,
+)
+
+# Attributes (also scanned over the whole document for id/tabindex)
+ID_RE = re.compile(r'\bid\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+FOR_RE = re.compile(r'\bfor\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+TABINDEX_RE = re.compile(r'\btabindex\s*=\s*["\']([0-9]+)["\']', re.IGNORECASE)
+SRC_RE = re.compile(r'\bsrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+HREF_RE = re.compile(r'\bhref\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+TYPE_RE = re.compile(r'\btype\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+NAME_RE = re.compile(r'\bname\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+CLASS_RE = re.compile(r'\bclass\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+ALT_RE = re.compile(r'\balt\s*=\s*["\']', re.IGNORECASE)
+ARIA_LABEL_RE = re.compile(r'\baria-label\s*=\s*["\']', re.IGNORECASE)
+ARIA_LABELLEDBY_RE = re.compile(r'\baria-labelledby\s*=\s*["\']', re.IGNORECASE)
+TITLE_RE = re.compile(r'\btitle\s*=\s*["\']', re.IGNORECASE)
+LANG_RE = re.compile(r'\blang\s*=\s*["\']', re.IGNORECASE)
+
+# Text helpers
+TAG_STRIP_RE = re.compile(r"<[^>]*>")
+# Leading run of whitespace and <...> tags; visible text starts where it ends.
+BLANK_MARKUP_RE = re.compile(r"(?:\s|<[^>]*>)*")
+# Filename separators become spaces; runs collapse later with the whitespace
+SEPARATOR_TRANS = str.maketrans("_-+", "   ")
+IMAGE_WORD_RE = re.compile(r"\b(img|image|photo|picture)\b", re.IGNORECASE)
+DIGITS_RE = re.compile(r"\d+")
+URL_SCHEME_RE = re.compile(r"https?://(www\.)?")
+SVG_RE = re.compile(r"<svg\b", re.IGNORECASE)
+ICON_RE = re.compile(r"\bicon\b")
+CLOSE_TEXT_RE = re.compile(r"\bclose\b")
+# Button hint words in attributes, found in one pass. When several appear,
+# the first label in BUTTON_HINT_ORDER wins.
+BUTTON_HINT_RE = re.compile(
+    r"\b(close|dismiss|cancel|submit|send|save|confirm|search|find"
+    r"|open-menu|menu|toggle|next|previous|prev)\b"
+)
+BUTTON_HINT_LABELS = {
+    "close": "Close", "dismiss": "Close", "cancel": "Close",
+    "submit": "Submit", "send": "Submit", "save": "Submit", "confirm": "Submit",
+    "search": "Search", "find": "Search",
+    "open-menu": "Open menu", "menu": "Open menu", "toggle": "Open menu",
+    "next": "Next", "previous": "Next", "prev": "Next",
+}
+BUTTON_HINT_ORDER = ("Close", "Submit", "Search", "Open menu", "Next")
+
+# Stops at every offset where one of the document-level patterns below could
+# start; the name of the matching group is the kind of match. aria-hidden stops
+# on the attribute itself, and the match is then taken from the tag holding it.
+SCAN_RE = re.compile(
+    r"<(?:(?P<img>img)|(?P<button>button)|(?P<input>input|select|textarea)"
+    r"|(?P<link>a)|(?P<heading>h[1-6])|(?P<html>html)|(?P<label>label))\b"
+    r'|(?P<aria_hidden>aria-hidden)(?=\s*=\s*["\']true["\'])'
+    r"|\b(?:(?P<id>id)|(?P<tabindex>tabindex))\s*=",
+    re.IGNORECASE,
+)
+
+# Pattern matched (anchored) at a scan stop of each kind.
+SCAN_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "img": IMG_RE,
+    "button": BUTTON_RE,
+    "input": INPUT_RE,
+    "link": LINK_RE,
+    "heading": HEADING_RE,
+    "html": HTML_RE,
+    "label": LABEL_FOR_RE,
+    "aria_hidden": ARIA_TAG_START_RE,
+    "id": ID_RE,
+    "tabindex": TABINDEX_RE,
+}
+
+def ascii_variant(pattern: "re.Pattern[str]") -> "re.Pattern[str]":
+    """Recompile `pattern` with ASCII-only classes and case folding."""
+    return re.compile(pattern.pattern, (pattern.flags & ~re.UNICODE) | re.ASCII)
+
+# For pure-ASCII input, Unicode and ASCII matching agree except that Unicode
+# \s also matches these four separators. Input without them can use the ASCII
+# variants, which skip the Unicode case-folding and class lookups.
+UNICODE_ONLY_SPACES = ("\x1c", "\x1d", "\x1e", "\x1f")
+SCAN_RE_ASCII = ascii_variant(SCAN_RE)
+SCAN_PATTERNS_ASCII: Dict[str, "re.Pattern[str]"] = {
+    kind: ascii_variant(pattern) for kind, pattern in SCAN_PATTERNS.items()
+}
+
+# Kinds matched at a tag stop. When one fails, no later stop of that kind can
+# match before the next ">".
+SCAN_TAG_KINDS = frozenset(("img", "button", "input", "link", "heading", "html", "label"))
+
+# Kinds that need a closing tag: once one fails, no closing tag follows, so
+# every later start fails too.
+SCAN_CLOSED_KINDS = frozenset(("button", "link", "heading"))
+
+ScanResult = Dict[str, List["re.Match[str]"]]
+
+# An edit as rules record it: (start offset, end offset, newText). Offsets are
+# turned into {line, column} only for the edits that reach the response.
+Edit = Tuple[int, int, str]
+
 # -----------------------------------------------------------------------------
 # Utilities
 # -----------------------------------------------------------------------------
 
-def offset_to_pos(text: str, offset: int) -> Dict[str, int]:
-    """Convert absolute character offset into zero-based {line, column}."""
-    offset = max(0, min(offset, len(text)))
-    prefix = text[:offset]
-    lines = prefix.split("\n")
-    line = len(lines) - 1
-    column = len(lines[-1])
-    return {"line": line, "column": column}
+def offsets_to_positions(text: str, offsets: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Convert absolute character offsets into zero-based {line, column}, keyed by
+    offset. Offsets are resolved in ascending order, and only the newlines in
+    the gap since the previous offset are counted, so the whole document is
+    walked once by str.count/rfind.
+    """
+    positions: Dict[int, Dict[str, int]] = {}
+    line = 0
+    line_start = 0
+    prev = 0
+    for offset in sorted(set(offsets)):
+        clamped = max(0, offset)
+        nl = text.rfind("\n", prev, clamped)
+        if nl >= 0:
+            line += text.count("\n", prev, nl + 1)
+            line_start = nl + 1
+        prev = clamped
+        positions[offset] = {"line": line, "column": clamped - line_start}
+    return positions
+
+def scan_document(code: str) -> ScanResult:
+    """
+    Walk `code` once and collect the matches of every document-level pattern,
+    grouped by kind. Each kind keeps finditer semantics: matches are in order
+    and never overlap an earlier match of the same kind.
+
+    A failed match also tells us where the next attempt of that kind could
+    succeed, and those stops are skipped. Without this, unclosed tags or a long
+    run without ">" make every later stop rescan to the end of the input.
+    """
+    end = len(code)
+    found: ScanResult = {kind: [] for kind in SCAN_PATTERNS}
+    resume = dict.fromkeys(SCAN_PATTERNS, 0)
+    if code.isascii() and not any(c in code for c in UNICODE_ONLY_SPACES):
+        scan_re, patterns = SCAN_RE_ASCII, SCAN_PATTERNS_ASCII
+    else:
+        scan_re, patterns = SCAN_RE, SCAN_PATTERNS
+
+    for s in scan_re.finditer(code):
+        pos = s.start()
+        kind = s.lastgroup
+        if pos < resume[kind]:
+            continue
+
+        if kind == "aria_hidden":
+            # A match ends at the first ">" after its tag, so each ">"-delimited
+            # run holds at most one, and it starts at the run's first tag name.
+            # A later tag start lies past that name, so it cannot do better.
+            gt = code.find(">", pos)
+            if gt < 0:
+                resume[kind] = end
+                continue
+            lo = max(code.rfind(">", resume[kind], pos) + 1, resume[kind])
+            resume[kind] = gt + 1
+            tag = patterns[kind].search(code, lo, gt)
+            if not tag or not ARIA_HIDDEN_ATTR_RE.search(code, tag.end(), gt):
+                continue
+            m = TAG_REST_RE.match(code, tag.start())
+        else:
+            m = patterns[kind].match(code, pos)
+
+        if m:
+            found[kind].append(m)
+            resume[kind] = m.end()
+        elif kind in SCAN_CLOSED_KINDS:
+            resume[kind] = end
+        elif kind in SCAN_TAG_KINDS:
+            gt = code.find(">", pos)
+            resume[kind] = gt if gt >= 0 else end
+
+    return found
+
+def strip_tags(s: str) -> str:
+    """Remove <...> tags from `s`; a trailing "<" with no ">" after it is kept."""
+    # Nothing after the last ">" can be a tag; bounding the substitution there
+    # keeps a long unterminated "<<<..." run linear.
+    cut = s.rfind(">") + 1
+    return TAG_STRIP_RE.sub("", s[:cut]) + s[cut:]
+
+def has_visible_text(s: str) -> bool:
+    """Same as bool(strip_tags(s).strip()), but stops at the first visible character."""
+    return BLANK_MARKUP_RE.match(s).end() < len(s)
 
 def sanitize_text_for_attr(s: str, max_len: int = 60) -> str:
     """Make a compact label suitable for alt/aria-label: collapse whitespace, trim, truncate."""
     if not s:
         return ""
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)
+    s = " ".join(s.split())  # trim and collapse whitespace runs
     s = s.replace('"', "'")  # avoid breaking attributes
     if len(s) > max_len:
         s = s[:max_len].rstrip() + "..."
@@ -82,18 +296,30 @@ def sanitize_text_for_attr(s: str, max_len: int = 60) -> str:
 # Heuristic guessers (no ML)
 # -----------------------------------------------------------------------------
 
+# Guesses keyed only on attribute text (src, href, a control's attributes) are
+# memoized: pages repeat the same CDN paths, hosts and form rows many times.
+# Keys longer than GUESS_CACHE_MAX_KEY bypass the caches so one large value
+# (an inline data: URI, say) is not kept alive across requests.
+GUESS_CACHE_SIZE = 4096
+GUESS_CACHE_MAX_KEY = 2048
+
 def guess_alt_from_src(src: str) -> str:
     """Guess a human-friendly alt from filename or src path."""
-    if not src:
-        return "Image"
-    src = src.split("?")[0].split("#")[0]  # strip query/fragment
-    if src.startswith("data:"):
+    if not src or src.startswith("data:"):
         return "Image"
+    path = src.split("?")[0].split("#")[0]  # strip query/fragment
+    if len(path) > GUESS_CACHE_MAX_KEY:
+        return guess_alt_from_path.__wrapped__(path)
+    return guess_alt_from_path(path)
+
+@lru_cache(maxsize=GUESS_CACHE_SIZE)
+def guess_alt_from_path(src: str) -> str:
+    """Guess an alt from a src path without query or fragment."""
     filename = os.path.basename(src)
     name = os.path.splitext(filename)[0]
-    name = re.sub(r"[_\-\+]+", " ", name)
-    name = re.sub(r"\b(img|image|photo|picture)\b", "", name, flags=re.I)
-    name = re.sub(r"\d+", "", name)
+    name = name.translate(SEPARATOR_TRANS)
+    name = IMAGE_WORD_RE.sub("", name)
+    name = DIGITS_RE.sub("", name)
     name = sanitize_text_for_attr(name).strip()
     if not name:
         return "Image"
@@ -104,40 +330,43 @@ def guess_button_label_from_attrs(attrs: str, inner_html: str) -> str:
     attrs_l = attrs.lower()
     inner_l = (inner_html or "").lower()
 
-    visible_text = re.sub(r"<[^>]*>", "", inner_html or "").strip()
-    if visible_text:
-        return sanitize_text_for_attr(visible_text)
-
-    if re.search(r"\b(close|dismiss|cancel|close-btn)\b", attrs_l) or re.search(
-        r"\bclose\b", inner_l
-    ):
-        return "Close"
-    if re.search(r"\b(submit|send|save|confirm)\b", attrs_l):
-        return "Submit"
-    if re.search(r"\b(search|find)\b", attrs_l):
-        return "Search"
-    if re.search(r"\b(menu|open-menu|toggle)\b", attrs_l):
-        return "Open menu"
-    if re.search(r"\b(next|prev|previous)\b", attrs_l):
-        return "Next"
-    if re.search(r"<svg\b", inner_html or "", flags=re.I) or re.search(
-        r"\bicon\b", attrs_l
-    ):
+    # Only build the stripped text when there is some to use as the label
+    if has_visible_text(inner_html or ""):
+        return sanitize_text_for_attr(strip_tags(inner_html).strip())
+
+    hints = {BUTTON_HINT_LABELS[h] for h in BUTTON_HINT_RE.findall(attrs_l)}
+    if "Close" not in hints and CLOSE_TEXT_RE.search(inner_l):
+        hints.add("Close")
+    for label in BUTTON_HINT_ORDER:
+        if label in hints:
+            return label
+    if SVG_RE.search(inner_html or "") or ICON_RE.search(attrs_l):
         return "Icon button"
     return "Button"
 
 def guess_input_label_from_attrs(tag_name: str, attrs: str) -> str:
     """Guess an input label from type/name/id/class attributes."""
-    type_m = re.search(r'\btype\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
-    name_m = re.search(r'\bname\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
-    id_m = re.search(r'\bid\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
-    class_m = re.search(r'\bclass\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
-
-    type_val = (type_m.group(1) if type_m else "").lower()
-    name_val = name_m.group(1) if name_m else ""
-    id_val = id_m.group(1) if id_m else ""
-    class_val = class_m.group(1) if class_m else ""
-
+    type_m = TYPE_RE.search(attrs)
+    name_m = NAME_RE.search(attrs)
+    id_m = ID_RE.search(attrs)
+    class_m = CLASS_RE.search(attrs)
+
+    values = (
+        (type_m.group(1) if type_m else "").lower(),
+        name_m.group(1) if name_m else "",
+        id_m.group(1) if id_m else "",
+        class_m.group(1) if class_m else "",
+    )
+    # Cached on the four values only, not on the rest of the attribute text
+    if sum(map(len, values)) > GUESS_CACHE_MAX_KEY:
+        return guess_input_label_from_values.__wrapped__(*values)
+    return guess_input_label_from_values(*values)
+
+@lru_cache(maxsize=GUESS_CACHE_SIZE)
+def guess_input_label_from_values(
+    type_val: str, name_val: str, id_val: str, class_val: str
+) -> str:
+    """Guess an input label from its type (lowercased), name, id and class values."""
     if "email" in (type_val + name_val + id_val + class_val):
         return "Email address"
     if "password" in (type_val + name_val + id_val):
@@ -163,11 +392,16 @@ def guess_input_label_from_attrs(tag_name: str, attrs: str) -> str:
 def guess_link_label_from_href(href: str, inner_html: str) -> str:
     """Guess a label for a link using href, inner content, or domain hints."""
     if not href:
-        visible = re.sub(r"<[^>]+>", "", inner_html or "").strip()
-        if visible:
-            return sanitize_text_for_attr(visible)
+        if has_visible_text(inner_html or ""):
+            return sanitize_text_for_attr(strip_tags(inner_html).strip())
         return "Link"
+    if len(href) > GUESS_CACHE_MAX_KEY:
+        return guess_link_label_from_url.__wrapped__(href)
+    return guess_link_label_from_url(href)
 
+@lru_cache(maxsize=GUESS_CACHE_SIZE)
+def guess_link_label_from_url(href: str) -> str:
+    """Guess a link label from a non-empty href alone."""
     href_l = href.lower()
     for name in ("twitter", "facebook", "linkedin", "instagram", "youtube", "github"):
         if name in href_l:
@@ -177,7 +411,7 @@ def guess_link_label_from_href(href: str, inner_html: str) -> str:
         part = href_l.strip("/").split("/")[0] or "page"
         return "Go to " + sanitize_text_for_attr(part.replace("-", " "))
 
-    host = re.sub(r"https?://(www\.)?", "", href_l).split("/")[0]
+    host = URL_SCHEME_RE.sub("", href_l).split("/")[0]
     host = host.split(":")[0]
     host = host.split(".")[-2] if "." in host else host
     host = sanitize_text_for_attr(host)
@@ -189,186 +423,148 @@ def guess_link_label_from_href(href: str, inner_html: str) -> str:
 # Rule implementations (heuristic)
 # -----------------------------------------------------------------------------
 
-def rule_image_alt(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_image_alt(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
   """Find <img> tags without alt and propose alt text heuristically."""
-  for m in re.finditer(r"<img\b([^>]*)\/?>", code, flags=re.IGNORECASE):
+  for m in found["img"]:
       attrs = m.group(1) or ""
-      if re.search(r'\balt\s*=\s*["\']', attrs, flags=re.I):
+      if ALT_RE.search(attrs):
           continue
 
-      src_m = re.search(r'\bsrc\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
+      src_m = SRC_RE.search(attrs)
       src_val = src_m.group(1) if src_m else ""
       alt_text = sanitize_text_for_attr(guess_alt_from_src(src_val))
 
-      insert_pos = m.start() + (
-          m.group(0).rfind(">")
-          if m.group(0).rfind(">") >= 0
-          else len(m.group(0))
-      )
-      edits.append(
-          {
-              "start": offset_to_pos(code, insert_pos),
-              "end": offset_to_pos(code, insert_pos),
-              "newText": f' alt="{alt_text}"',
-          }
-      )
-
-def rule_button_name(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+      insert_pos = m.end() - 1  # the match ends at the tag's ">"
+      edits.append((insert_pos, insert_pos, f' alt="{alt_text}"'))
+
+def rule_button_name(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Find <button> without accessible name and propose aria-labels."""
-    for m in re.finditer(
-        r"<button\b([^>]*)>([\s\S]*?)</button>", code, flags=re.IGNORECASE
-    ):
+    for m in found["button"]:
         attrs = m.group(1) or ""
         inner = m.group(2) or ""
 
-        if re.search(r'\baria-label\s*=\s*["\']', attrs, flags=re.I) or re.search(
-            r'\baria-labelledby\s*=\s*["\']', attrs, flags=re.I
-        ) or re.search(r'\btitle\s*=\s*["\']', attrs, flags=re.I):
+        if (
+            ARIA_LABEL_RE.search(attrs)
+            or ARIA_LABELLEDBY_RE.search(attrs)
+            or TITLE_RE.search(attrs)
+        ):
             continue
 
-        visible_text = re.sub(r"<[^>]*>", "", inner or "").strip()
-        if visible_text:
+        if has_visible_text(inner):
             continue
 
         label = guess_button_label_from_attrs(attrs, inner)
-        insert_pos = m.start() + (m.group(0).find(">") if m.group(0).find(">") >= 0 else 0)
-        edits.append(
-            {
-                "start": offset_to_pos(code, insert_pos),
-                "end": offset_to_pos(code, insert_pos),
-                "newText": f' aria-label="{label}"',
-            }
-        )
+        insert_pos = m.end(1)  # the ">" closing the open tag follows the attrs
+        edits.append((insert_pos, insert_pos, f' aria-label="{label}"'))
 
-def rule_input_label(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_input_label(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Add aria-labels for unlabeled form controls (inputs/selects/textareas)."""
-    for m in re.finditer(
-        r"<(input|select|textarea)\b([^>]*)\/?>", code, flags=re.IGNORECASE
-    ):
+    # Ids referenced by <label for="...">, looked up instead of rescanning per
+    # control. A label match runs up to its last for=, so collect every one in it,
+    # overlapping ones included: in for="a for='b'" both a for= and b count.
+    # str.lower() only agrees with re.IGNORECASE on ASCII, so non-ASCII values
+    # are kept aside and compared the way the per-control search did.
+    labeled_ids = set()
+    other_fors: List[str] = []
+    for lm in found["label"]:
+        label = lm.group(0)
+        fm = FOR_RE.search(label)
+        while fm:
+            value = fm.group(1)
+            if value.isascii():
+                labeled_ids.add(value.lower())
+            else:
+                other_fors.append(value)
+            fm = FOR_RE.search(label, fm.start() + 1)
+    all_fors = [*labeled_ids, *other_fors]
+
+    for m in found["input"]:
         tag = m.group(1).lower()
         attrs = m.group(2) or ""
 
-        if re.search(r'\baria-label\s*=\s*["\']', attrs, flags=re.I) or re.search(
-            r'\baria-labelledby\s*=\s*["\']', attrs, flags=re.I
-        ):
+        if ARIA_LABEL_RE.search(attrs) or ARIA_LABELLEDBY_RE.search(attrs):
             continue
 
-        id_m = re.search(r'\bid\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
+        id_m = ID_RE.search(attrs)
         if id_m:
             idv = id_m.group(1)
-            if re.search(
-                rf'<label\b[^>]*\bfor\s*=\s*["\']{re.escape(idv)}["\']',
-                code,
-                flags=re.I,
-            ):
+            if idv.isascii():
+                if idv.lower() in labeled_ids:
+                    continue
+                candidates = other_fors
+            else:
+                candidates = all_fors
+            id_re = re.escape(idv)
+            if any(re.fullmatch(id_re, value, re.IGNORECASE) for value in candidates):
                 continue
 
         label = guess_input_label_from_attrs(tag, attrs)
-        match_str = m.group(0)
-        insert_pos = m.start() + (
-            match_str.rfind(">")
-            if match_str.rfind(">") >= 0
-            else len(match_str)
-        )
-        edits.append(
-            {
-                "start": offset_to_pos(code, insert_pos),
-                "end": offset_to_pos(code, insert_pos),
-                "newText": f' aria-label="{label}"',
-            }
-        )
+        insert_pos = m.end() - 1  # the match ends at the tag's ">"
+        edits.append((insert_pos, insert_pos, f' aria-label="{label}"'))
 
-def rule_link_name(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_link_name(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """
     Add missing accessible name for anchors:
     - if image-only link: add alt to inner <img>
     - else: add aria-label to <a>.
     """
-    for m in re.finditer(r"<a\b([^>]*)>([\s\S]*?)</a>", code, flags=re.IGNORECASE):
+    for m in found["link"]:
         attrs = m.group(1) or ""
         inner = m.group(2) or ""
 
-        if re.search(r'\baria-label\s*=\s*["\']', attrs, flags=re.I):
+        if ARIA_LABEL_RE.search(attrs):
             continue
 
-        visible = re.sub(r"<[^>]*>", "", inner or "").strip()
-        if visible:
+        if has_visible_text(inner):
             continue
 
-        img_m = re.search(r"<img\b([^>]*)\/?>", inner, flags=re.IGNORECASE)
+        # No <img> can match after the last ">", so stop searching there.
+        img_m = IMG_RE.search(inner, 0, inner.rfind(">") + 1)
         if img_m:
             img_attrs = img_m.group(1) or ""
-            if not re.search(r'\balt\s*=\s*["\']', img_attrs, flags=re.I):
-                inner_start = m.start(2)
-                img_index_in_inner = inner.find(img_m.group(0))
-                absolute_img_start = inner_start + img_index_in_inner
-                insert_pos = absolute_img_start + (
-                    img_m.group(0).rfind(">")
-                    if img_m.group(0).rfind(">") >= 0
-                    else len(img_m.group(0))
-                )
-                src_m = re.search(
-                    r'\bsrc\s*=\s*["\']([^"\']+)["\']', img_attrs, flags=re.I
-                )
+            if not ALT_RE.search(img_attrs):
+                insert_pos = m.start(2) + img_m.end() - 1
+                src_m = SRC_RE.search(img_attrs)
                 src_val = src_m.group(1) if src_m else ""
                 alt_guess = guess_alt_from_src(src_val)
-                edits.append(
-                    {
-                        "start": offset_to_pos(code, insert_pos),
-                        "end": offset_to_pos(code, insert_pos),
-                        "newText": f' alt="{alt_guess}"',
-                    }
-                )
+                edits.append((insert_pos, insert_pos, f' alt="{alt_guess}"'))
                 continue
 
-        href_m = re.search(r'\bhref\s*=\s*["\']([^"\']+)["\']', attrs, flags=re.I)
+        href_m = HREF_RE.search(attrs)
         href_val = href_m.group(1) if href_m else ""
         label = guess_link_label_from_href(href_val, inner)
-        open_tag_end = m.start() + (m.group(0).find(">") if m.group(0).find(">") >= 0 else 0)
-        edits.append(
-            {
-                "start": offset_to_pos(code, open_tag_end),
-                "end": offset_to_pos(code, open_tag_end),
-                "newText": f' aria-label="{label}"',
-            }
-        )
+        open_tag_end = m.end(1)
+        edits.append((open_tag_end, open_tag_end, f' aria-label="{label}"'))
 
-def rule_duplicate_id(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_duplicate_id(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Append -1, -2 ... to duplicate id attribute values (leave first occurrence intact)."""
-    occurrences = []
-    for m in re.finditer(r'\bid\s*=\s*["\']([^"\']+)["\']', code, flags=re.IGNORECASE):
+    # Occurrences seen so far per id value; every repeat is renamed as it is met
+    counts: Dict[str, int] = {}
+    for m in found["id"]:
         idval = m.group(1)
-        match_str = m.group(0)
-        idx = m.start() + match_str.lower().find(idval.lower())
-        occurrences.append((idval, idx))
-
-    groups: Dict[str, List[int]] = {}
-    for idval, idx in occurrences:
-        groups.setdefault(idval, []).append(idx)
-
-    for idval, arr in groups.items():
-        if len(arr) <= 1:
+        n = counts.get(idval, 0)
+        counts[idval] = n + 1
+        if n == 0:
             continue
-        for i, abs_idx in enumerate(arr):
-            if i == 0:
-                continue
-            new_id = f"{idval}-{i}"
-            edits.append(
-                {
-                    "start": offset_to_pos(code, abs_idx),
-                    "end": offset_to_pos(code, abs_idx + len(idval)),
-                    "newText": new_id,
-                }
-            )
+        val_start = m.start(1)
+        edits.append((val_start, val_start + len(idval), f"{idval}-{n}"))
 
-def rule_heading_order(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_heading_order(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Detect heading level skips and rename offending headings to lastLevel+1."""
     headings = []
-    for m in re.finditer(
-        r"<(h[1-6])\b([^>]*)>([\s\S]*?)</(h[1-6])>",
-        code,
-        flags=re.IGNORECASE,
-    ):
+    for m in found["heading"]:
         open_tag = m.group(1).lower()
         level = int(open_tag[1])
         headings.append((m.start(), m.group(0), level))
@@ -381,129 +577,169 @@ def rule_heading_order(code: str, edits: List[Dict[str, Any]], warnings: List[st
             open_abs = start_pos + open_rel
             close_rel = block.rfind(f"</h{level}>")
             close_abs = start_pos + close_rel + 2  # +2 to start at 'h'
-            edits.append(
-                {
-                    "start": offset_to_pos(code, open_abs),
-                    "end": offset_to_pos(code, open_abs + len(f"h{level}")),
-                    "newText": f"h{target}",
-                }
-            )
-            edits.append(
-                {
-                    "start": offset_to_pos(code, close_abs),
-                    "end": offset_to_pos(code, close_abs + len(f"h{level}")),
-                    "newText": f"h{target}",
-                }
-            )
+            edits.append((open_abs, open_abs + len(f"h{level}"), f"h{target}"))
+            edits.append((close_abs, close_abs + len(f"h{level}"), f"h{target}"))
             warnings.append(
                 f"Changed heading level h{level} -> h{target} at offset {start_pos} to fix order."
             )
         last = level
 
-def rule_no_positive_tabindex(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_no_positive_tabindex(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Replace positive tabindex values by 0."""
-    for m in re.finditer(
-        r'\btabindex\s*=\s*["\']([0-9]+)["\']', code, flags=re.IGNORECASE
-    ):
+    for m in found["tabindex"]:
         try:
             val = int(m.group(1))
             if val > 0:
                 val_start = m.start(1)
-                edits.append(
-                    {
-                        "start": offset_to_pos(code, val_start),
-                        "end": offset_to_pos(code, val_start + len(m.group(1))),
-                        "newText": "0",
-                    }
-                )
+                edits.append((val_start, val_start + len(m.group(1)), "0"))
         except Exception:
             continue
 
-def rule_html_lang(code: str, edits: List[Dict[str, Any]], warnings: List[str]) -> None:
+def rule_html_lang(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
     """Add lang='en' to <html> if missing."""
-    m = re.search(r"<html\b([^>]*)>", code, flags=re.IGNORECASE)
-    if m:
+    if found["html"]:
+        m = found["html"][0]
         attrs = m.group(1) or ""
-        if not re.search(r'\blang\s*=\s*["\']', attrs, flags=re.I):
-            insert_pos = m.start() + m.group(0).rfind(">")
-            edits.append(
-                {
-                    "start": offset_to_pos(code, insert_pos),
-                    "end": offset_to_pos(code, insert_pos),
-                    "newText": ' lang="en"',
-                }
-            )
+        if not LANG_RE.search(attrs):
+            insert_pos = m.end() - 1
+            edits.append((insert_pos, insert_pos, ' lang="en"'))
 
 def rule_form_control_has_label(
-    code: str, edits: List[Dict[str, Any]], warnings: List[str]
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
 ) -> None:
     """Placeholder for future form-label refinements (heuristics already handled above)."""
     return
 
+def rule_aria_hidden_focus(
+    code: str, found: ScanResult, edits: List[Edit], warnings: List[str]
+) -> None:
+    """Warn (no edits) when an aria-hidden element is followed by focusable content."""
+    for m in found["aria_hidden"]:
+        # Search the 400 characters after the tag in place instead of slicing.
+        # Every focusable pattern contains "<" or "=", so without either the
+        # regex cannot match.
+        start, stop = m.end(), m.end() + 400
+        if code.find("<", start, stop) < 0 and code.find("=", start, stop) < 0:
+            continue
+        if FOCUSABLE_RE.search(code, start, stop):
+            warnings.append(
+                "aria-hidden element contains focusable children; "
+                "consider removing aria-hidden or making content non-focusable."
+            )
+
+# -----------------------------------------------------------------------------
+# Rule pipeline
+# -----------------------------------------------------------------------------
+
+MAX_CHARS = 600_000
+
+def run_rules(code: str) -> Dict[str, Any]:
+    """Run every rule over `code` and return {"edits": [...], "warnings": [...]}."""
+    edits: List[Edit] = []
+    warnings: List[str] = []
+
+    if len(code) > MAX_CHARS:
+        warnings.append("Input truncated due to size.")
+        code = code[:MAX_CHARS]
+
+    # Scan the document once, then apply rules to the collected matches
+    found = scan_document(code)
+    rule_image_alt(code, found, edits, warnings)
+    rule_input_label(code, found, edits, warnings)
+    rule_link_name(code, found, edits, warnings)
+    rule_button_name(code, found, edits, warnings)
+    rule_duplicate_id(code, found, edits, warnings)
+    rule_heading_order(code, found, edits, warnings)
+    rule_no_positive_tabindex(code, found, edits, warnings)
+    rule_html_lang(code, found, edits, warnings)
+    rule_form_control_has_label(code, found, edits, warnings)
+    rule_aria_hidden_focus(code, found, edits, warnings)
+
+    # Deduplicate identical edits, keeping the first of each
+    edits = list(dict.fromkeys(edits))
+
+    # Sort edits descending by position
+    edits.sort(key=lambda e: e[0], reverse=True)
+
+    # Convert the surviving offsets in one ascending sweep of the document
+    positions = offsets_to_positions(code, (o for e in edits for o in e[:2]))
+
+    return {
+        "edits": [
+            {"start": positions[start], "end": positions[end], "newText": text}
+            for start, end, text in edits
+        ],
+        "warnings": warnings,
+    }
+
 # -----------------------------------------------------------------------------
 # Main endpoint
 # -----------------------------------------------------------------------------
 
+# The response model documents the schema; the body is serialized directly
+# because every edit is built here and needs no validation on the way out.
 @app.post("/generate", response_model=GenerateResponse)
-async def generate(req: GenerateRequest):
+async def generate(req: GenerateRequest) -> Response:
     code = req.code or ""
     # mode is kept for compatibility; we only run heuristic logic.
     _mode = (req.mode or "heuristic").lower()
-    edits: List[Dict[str, Any]] = []
-    warnings: List[str] = []
 
-    MAX_CHARS = 600_000
-    if len(code) > MAX_CHARS:
-        warnings.append("Input truncated due to size.")
-        code = code[:MAX_CHARS]
+    # Rules are CPU-bound; run them on the threadpool so the event loop keeps
+    # serving other requests meanwhile.
+    result = await run_in_threadpool(run_rules, code)
 
-    # Apply rules
-    rule_image_alt(code, edits, warnings)
-    rule_input_label(code, edits, warnings)
-    rule_link_name(code, edits, warnings)
-    rule_button_name(code, edits, warnings)
-    rule_duplicate_id(code, edits, warnings)
-    rule_heading_order(code, edits, warnings)
-    rule_no_positive_tabindex(code, edits, warnings)
-    rule_html_lang(code, edits, warnings)
-    rule_form_control_has_label(code, edits, warnings)
-
-    # aria-hidden checks: warn only (no edits)
-    for m in re.finditer(
-        r'<([a-z0-9\-]+)\b([^>]*)aria-hidden\s*=\s*["\']true["\']([^>]*)>',
-        code,
-        flags=re.IGNORECASE,
-    ):
-        snippet = code[m.end() : m.end() + 400]
-        if re.search(
-            r'(tabindex\s*=\s*["\']0["\']|href=|<button\b|<a\b|<input\b|<select\b|<textarea\b)',
-            snippet,
-            flags=re.IGNORECASE,
-        ):
-            warnings.append(
-                "aria-hidden element contains focusable children; "
-                "consider removing aria-hidden or making content non-focusable."
-            )
+    return Response(orjson.dumps(result), media_type="application/json")
+
+# Documents are independent, so a batch is spread over one worker process per
+# core. Workers are spawned rather than forked (the server already runs
+# threadpool threads) and import this module, compiling the patterns once each.
+MAX_BATCH_DOCS = 64
+POOL: Optional[ProcessPoolExecutor] = None
 
-    # Deduplicate identical edits
-    unique: List[Dict[str, Any]] = []
-    seen = set()
-    for e in edits:
-        key = (
-            e["start"]["line"],
-            e["start"]["column"],
-            e["end"]["line"],
-            e["end"]["column"],
-            e["newText"],
+def batch_pool() -> ProcessPoolExecutor:
+    """The shared worker pool, created on first use and again after it breaks."""
+    global POOL
+    if POOL is None:
+        POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+    return POOL
+
+def shutdown_batch_pool() -> None:
+    """Stop the worker pool, if one is running."""
+    global POOL
+    if POOL is not None:
+        POOL.shutdown(wait=False, cancel_futures=True)
+        POOL = None
+
+@app.post("/generate_batch", response_model=GenerateBatchResponse)
+async def generate_batch(req: GenerateBatchRequest) -> Response:
+    if len(req.codes) > MAX_BATCH_DOCS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BATCH_DOCS} documents per batch."
         )
-        if key not in seen:
-            seen.add(key)
-            unique.append(e)
-    edits = unique
 
-    # Sort edits descending by position
-    edits.sort(
-        key=lambda e: (e["start"]["line"], e["start"]["column"]), reverse=True
-    )
+    pool = batch_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        # Truncate before pickling to the workers; the one extra character
+        # still lets run_rules report the truncation.
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, run_rules, (code or "")[: MAX_CHARS + 1])
+                for code in req.codes
+            )
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        if POOL is pool:
+            shutdown_batch_pool()
+        raise HTTPException(
+            status_code=503, detail="Batch worker stopped unexpectedly; please retry."
+        )
 
-    return {"edits": edits, "warnings": warnings}
+    return Response(orjson.dumps({"results": results}), media_type="application/json")
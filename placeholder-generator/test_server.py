@@ -0,0 +1,80 @@
+"""
+Regression tests for the single-pass scan in server.py.
+
+Run from this directory with `python -m unittest` (or pytest).
+"""
+
+import time
+import unittest
+
+from server import MAX_CHARS, run_rules
+
+ARIA_WARNING = (
+    "aria-hidden element contains focusable children; consider removing "
+    "aria-hidden or making content non-focusable."
+)
+
+def edit(column: int, new_text: str, end_column: int = -1) -> dict:
+    """A single-line edit at `column` (an insertion unless `end_column` is given)."""
+    end = column if end_column < 0 else end_column
+    return {
+        "start": {"line": 0, "column": column},
+        "end": {"line": 0, "column": end},
+        "newText": new_text,
+    }
+
+# -----------------------------------------------------------------------------
+# Adversarial inputs: each used to take seconds to tens of seconds
+# -----------------------------------------------------------------------------
+
+class AdversarialTimingTest(unittest.TestCase):
+    # Generous next to the few milliseconds each takes, far below the old times.
+    TIME_LIMIT = 1.0
+
+    def assert_fast(self, code: str) -> dict:
+        self.assertLessEqual(len(code), MAX_CHARS)
+        started = time.perf_counter()
+        result = run_rules(code)
+        self.assertLess(time.perf_counter() - started, self.TIME_LIMIT)
+        return result
+
+    def test_unclosed_buttons(self):
+        self.assert_fast("<button>x" * 20_000)
+
+    def test_lt_run_inside_link(self):
+        self.assert_fast("<a href='/x'>" + "<" * 500_000 + "</a>")
+
+    def test_aria_hidden_then_unclosed_tags(self):
+        result = self.assert_fast('aria-hidden="true" ' + "<x " * 199_000 + ">")
+        self.assertEqual(result, {"edits": [], "warnings": []})
+
+# -----------------------------------------------------------------------------
+# Overlapping matches: one kind's match inside or across another's
+# -----------------------------------------------------------------------------
+
+class OverlapTest(unittest.TestCase):
+    def test_img_inside_link(self):
+        code = '<a href="/docs/intro"><img src="/img/logo.png"></a>'
+        self.assertEqual(
+            run_rules(code), {"edits": [edit(46, ' alt="Logo"')], "warnings": []}
+        )
+
+    def test_id_inside_tag(self):
+        code = '<img id="logo" src="/logo.png" alt="Logo"><button id="logo">Go</button>'
+        self.assertEqual(
+            run_rules(code),
+            {"edits": [edit(54, "logo-1", 58)], "warnings": []},
+        )
+
+    def test_aria_hidden_in_tag_name(self):
+        # The tag name "x" ends at the "-", so the attribute still counts
+        code = '<x-aria-hidden="true"><a href="/about">About</a>'
+        self.assertEqual(run_rules(code), {"edits": [], "warnings": [ARIA_WARNING]})
+
+    def test_for_inside_for_value(self):
+        # The first for= value swallows the second; the id still counts as labelled
+        code = """<label for="a for='b'></label><input id="b">"""
+        self.assertEqual(run_rules(code), {"edits": [], "warnings": []})
+
+if __name__ == "__main__":
+    unittest.main()